@@ -1,18 +1,75 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
 import httpx
+import orjson
 from fastmcp import FastMCP, Context
 from fastmcp.utilities.types import Image
 import base64
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Tuple, Union
 
-# Create a generic MCP server for interacting with Revit
-mcp = FastMCP("Revit MCP Server")
+from tools.utils import server_supports
+
+try:
+    import zstandard  # optional: pip install simple-revit-mcp[compression]
+except ImportError:
+    zstandard = None
 
 # Configuration
 REVIT_HOST = "localhost"
 REVIT_PORT = 48884  # Default pyRevit Routes port
 BASE_URL = f"http://{REVIT_HOST}:{REVIT_PORT}/revit_mcp"
 
+# Connection pool shared by all tool calls (override via environment)
+MAX_CONNECTIONS = int(os.environ.get("REVIT_MAX_CONNECTIONS", "64"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("REVIT_MAX_KEEPALIVE_CONNECTIONS", "32"))
+KEEPALIVE_EXPIRY = float(os.environ.get("REVIT_KEEPALIVE_EXPIRY", "30.0"))
+
+# Request bodies larger than this are zstd-compressed when the extension accepts it
+COMPRESS_MIN_BYTES = 16 * 1024
+
+# GET responses that carried an ETag, revalidated with If-None-Match (most recent last)
+ETAG_CACHE_SIZE = 256
+
+_client: Optional[httpx.AsyncClient] = None
+_etags: "OrderedDict[Tuple[str, bytes], Tuple[str, Any]]" = OrderedDict()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        # retries only covers connection failures, so requests are never sent twice
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            headers={"Accept": "application/json"},
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=1),
+        )
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Close the shared HTTP client when the MCP server shuts down"""
+    try:
+        yield
+    finally:
+        if _client is not None:
+            await _client.aclose()
+
+
+# Create a generic MCP server for interacting with Revit
+mcp = FastMCP("Revit MCP Server", lifespan=lifespan)
+
 
 async def revit_get(endpoint: str, ctx: Context = None, **kwargs) -> Union[Dict, str]:
     """Simple GET request to Revit API"""
@@ -27,32 +84,140 @@ async def revit_post(endpoint: str, data: Dict[str, Any], ctx: Context = None, *
 async def revit_image(endpoint: str, ctx: Context = None) -> Union[Image, str]:
     """GET request that returns an Image object"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(f"{BASE_URL}{endpoint}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                image_bytes = base64.b64decode(data["image_data"])
-                return Image(data=image_bytes, format="png")
-            else:
-                return f"Error: {response.status_code} - {response.text}"
+        response = await _get_client().get(endpoint, timeout=60.0)
+
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            image_bytes = base64.b64decode(data["image_data"])
+            return Image(data=image_bytes, format="png")
+        else:
+            return f"Error: {response.status_code} - {response.text}"
     except Exception as e:
         return f"Error: {e}"
 
 
+def _decode(response: httpx.Response) -> Union[Dict, str]:
+    """Parse a 200 reply straight from its bytes; other replies become error strings
+
+    A 200 reply that is explicitly not JSON (e.g. a plain-text page from a
+    misconfigured route) is returned as text rather than failing to parse.
+    """
+    if response.status_code != 200:
+        return f"Error: {response.status_code} - {response.text}"
+    content_type = response.headers.get("content-type", "")
+    if content_type and "json" not in content_type:
+        return response.text
+    return orjson.loads(response.content)
+
+
+async def _encode_body(endpoint: str, data: Dict, ctx: Context = None,
+                       idempotent: bool = False) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize a POST body, compressing large ones when the extension supports zstd
+
+    With idempotent=True the request carries an Idempotency-Key derived from
+    endpoint and body, so the extension can answer a retried identical request
+    with its cached result instead of running the operation twice. Only the
+    create-type routes (sheets, walls, placements) opt in: for reads and for
+    parameter writes, an identical later request must run again.
+    """
+    try:
+        body = orjson.dumps(data)
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which the stdlib encoder still handles
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if idempotent:
+        digest = hashlib.blake2b(b"POST " + endpoint.encode("utf-8") + b"\n" + body, digest_size=16)
+        headers["Idempotency-Key"] = digest.hexdigest()
+    if zstandard is not None and len(body) > COMPRESS_MIN_BYTES \
+            and await server_supports(revit_get, "zstd_requests", ctx):
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+        headers["Content-Encoding"] = "zstd"
+    return body, headers
+
+
+async def _revit_stream(endpoint: str, data: Dict, ctx: Context, timeout: float,
+                       idempotent: bool = False) -> Union[Dict, str]:
+    """POST that consumes an NDJSON progress stream from a long-running route.
+
+    Each line is one JSON event: {"progress": n, "total": m, "message": ...}
+    events are forwarded to the MCP client as progress notifications, and the
+    event carrying "result" is returned. Blank lines are heartbeats. Since the
+    timeout applies per read, it bounds the gap between events rather than the
+    whole operation. A plain JSON reply is returned unchanged.
+    """
+    body, headers = await _encode_body(endpoint, data, ctx, idempotent)
+    headers["Accept"] = "application/x-ndjson, application/json"
+    async with _get_client().stream("POST", endpoint, content=body, headers=headers,
+                                    timeout=timeout) as response:
+        plain_reply = response.status_code != 200 or \
+            not response.headers.get("content-type", "").startswith("application/x-ndjson")
+        if plain_reply:
+            await response.aread()
+            return _decode(response)
+
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            event = orjson.loads(line)
+            if "result" in event:
+                return event["result"]
+            if "error" in event:
+                return event
+            if ctx and "progress" in event:
+                await ctx.report_progress(event["progress"], event.get("total"), event.get("message"))
+    return "Error: stream ended without a result"
+
+
+async def _revit_get_revalidated(client: httpx.AsyncClient, endpoint: str, params: Dict,
+                                 timeout: float) -> Union[Dict, str]:
+    """GET that reuses the previous body when the extension answers 304 Not Modified
+
+    Routes that send an ETag get it back as If-None-Match on the next request
+    for the same endpoint and params, so unchanged data is not re-serialized
+    by Revit or re-parsed here.
+    """
+    key = (endpoint, orjson.dumps(params, option=orjson.OPT_SORT_KEYS) if params else b"")
+    cached = _etags.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+
+    response = await client.get(endpoint, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        _etags.move_to_end(key)
+        return cached[1]
+    result = _decode(response)
+    if response.status_code != 200:
+        return result
+
+    etag = response.headers.get("etag")
+    if etag:
+        _etags[key] = (etag, result)
+        _etags.move_to_end(key)
+        while len(_etags) > ETAG_CACHE_SIZE:
+            _etags.popitem(last=False)
+    return result
+
+
 async def _revit_call(method: str, endpoint: str, data: Dict = None, ctx: Context = None, 
-                     timeout: float = 30.0, params: Dict = None) -> Union[Dict, str]:
-    """Internal function handling all HTTP calls"""
+                     timeout: float = 30.0, params: Dict = None, stream: bool = False,
+                     idempotent: bool = False) -> Union[Dict, str]:
+    """Internal function handling all HTTP calls
+
+    `timeout` is passed straight to httpx, which enforces it on the socket
+    operations themselves - no asyncio.wait_for/timeout wrapper (and the extra
+    task and cancellation it costs) is needed around the request.
+    """
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            url = f"{BASE_URL}{endpoint}"
-            
-            if method == "GET":
-                response = await client.get(url, params=params)
-            else:  # POST
-                response = await client.post(url, json=data, headers={"Content-Type": "application/json"})
-            
-            return response.json() if response.status_code == 200 else f"Error: {response.status_code} - {response.text}"
+        client = _get_client()
+
+        if stream:
+            return await _revit_stream(endpoint, data, ctx, timeout, idempotent)
+        if method == "GET":
+            return await _revit_get_revalidated(client, endpoint, params, timeout)
+
+        body, headers = await _encode_body(endpoint, data, ctx, idempotent)
+        response = await client.post(endpoint, content=body, headers=headers, timeout=timeout)
+        return _decode(response)
     except Exception as e:
         return f"Error: {e}"
 
@@ -63,4 +228,4 @@ register_tools(mcp, revit_get, revit_post, revit_image)
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    mcp.run(transport="stdio")
@@ -1,29 +1,52 @@
 # -*- coding: utf-8 -*-
 """Tool registration system for Revit MCP Server"""
 
+import importlib
+import os
+
+# Tool set name -> (module, register function, Revit callables it receives)
+TOOL_MODULES = {
+    "status": ("status_tools", "register_status_tools", ("get",)),
+    "views": ("view_tools", "register_view_tools", ("get", "post", "image")),
+    "families": ("family_tools", "register_family_tools", ("get", "post")),
+    "model": ("model_tools", "register_model_tools", ("get",)),
+    "colors": ("colors_tools", "register_colors_tools", ("get", "post")),
+    "code_execution": ("code_execution_tools", "register_code_execution_tools", ("get", "post", "image")),
+    "selection": ("selection_tools", "register_selection_tools", ("get", "post")),
+    "parameters": ("parameter_tools", "register_parameter_tools", ("get", "post")),
+    "ifc": ("ifc_tools", "register_ifc_tools", ("get", "post")),
+    "modification": ("modification_tools", "register_modification_tools", ("get", "post")),
+    "batch": ("batch_tools", "register_batch_tools", ("get", "post")),
+}
+
+
+def enabled_tool_sets():
+    """Tool sets to register, from REVIT_MCP_TOOLSETS (comma-separated, default: all)"""
+    selected = os.environ.get("REVIT_MCP_TOOLSETS", "").strip()
+    if not selected:
+        return list(TOOL_MODULES)
+
+    # Listing a set twice would register its tools twice; keep the first mention
+    names = list(dict.fromkeys(name.strip() for name in selected.split(",") if name.strip()))
+    unknown = [name for name in names if name not in TOOL_MODULES]
+    if unknown:
+        raise ValueError(
+            "Unknown tool sets in REVIT_MCP_TOOLSETS: {} (available: {})".format(
+                ", ".join(unknown), ", ".join(TOOL_MODULES)
+            )
+        )
+    return names
+
 
 def register_tools(mcp_server, revit_get_func, revit_post_func, revit_image_func):
-    """Register all tools with the MCP server"""
-    from .status_tools import register_status_tools
-    from .view_tools import register_view_tools
-    from .family_tools import register_family_tools
-    from .model_tools import register_model_tools
-    from .colors_tools import register_colors_tools
-    from .code_execution_tools import register_code_execution_tools
-    from .selection_tools import register_selection_tools
-    from .parameter_tools import register_parameter_tools
-    from .ifc_tools import register_ifc_tools
-    from .modification_tools import register_modification_tools
-
-    register_status_tools(mcp_server, revit_get_func)
-    register_view_tools(mcp_server, revit_get_func, revit_post_func, revit_image_func)
-    register_family_tools(mcp_server, revit_get_func, revit_post_func)
-    register_model_tools(mcp_server, revit_get_func)
-    register_colors_tools(mcp_server, revit_get_func, revit_post_func)
-    register_code_execution_tools(
-        mcp_server, revit_get_func, revit_post_func, revit_image_func
-    )
-    register_selection_tools(mcp_server, revit_get_func, revit_post_func)
-    register_parameter_tools(mcp_server, revit_get_func, revit_post_func)
-    register_ifc_tools(mcp_server, revit_get_func, revit_post_func)
-    register_modification_tools(mcp_server, revit_get_func, revit_post_func)
+    """Register all enabled tools with the MCP server
+
+    Tool modules are imported only when their tool set is enabled, so a server
+    started with e.g. REVIT_MCP_TOOLSETS=status,selection skips importing the rest.
+    """
+    callables = {"get": revit_get_func, "post": revit_post_func, "image": revit_image_func}
+
+    for name in enabled_tool_sets():
+        module_name, register_name, args = TOOL_MODULES[name]
+        module = importlib.import_module("." + module_name, __name__)
+        getattr(module, register_name)(mcp_server, *(callables[arg] for arg in args))
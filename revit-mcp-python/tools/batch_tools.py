@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Batch tool for running several Revit operations in one call"""
+
+from fastmcp import Context
+from typing import Any, Dict, List
+from .payloads import (
+    all_parameters_payload,
+    batch_update_payload,
+    bulk_parameters_payload,
+    clear_colors_payload,
+    color_splash_payload,
+    create_sheet_payload,
+    family_placement_payload,
+    get_parameter_payload,
+    multi_parameters_payloads,
+    place_view_payload,
+    quick_count_payload,
+    set_parameter_payload,
+    walls_payload,
+)
+from .utils import format_response, invalidate, is_error, log, server_supports
+
+# Tools allowed in a batch, mapped to the route they post to and the payload
+# builder the tool itself uses, so batched args get the tool's defaults and checks
+BATCH_ENDPOINTS = {
+    "batch_update": ("/batch_update/", batch_update_payload),
+    "create_sheet": ("/create_sheet/", create_sheet_payload),
+    "place_view_on_sheet": ("/place_view_on_sheet/", place_view_payload),
+    "create_walls_at_lines": ("/create_walls_at_lines/", walls_payload),
+    "batch_family_placement": ("/batch_family_placement/", family_placement_payload),
+    "get_element_parameter": ("/get_parameter/", get_parameter_payload),
+    "set_element_parameter": ("/set_parameter/", set_parameter_payload),
+    "get_all_parameters": ("/get_all_parameters/", all_parameters_payload),
+    "set_parameters_bulk": ("/set_parameters_bulk/", bulk_parameters_payload),
+    "set_parameters_multi_elements": ("/set_parameters_multi/", multi_parameters_payloads),
+    "quick_count": ("/quick_count/", quick_count_payload),
+    "color_splash": ("/color_splash/", color_splash_payload),
+    "clear_colors": ("/clear_colors/", clear_colors_payload),
+}
+
+
+def register_batch_tools(mcp, revit_get, revit_post):
+    """Register batch tools"""
+
+    @mcp.tool()
+    async def submit_batch(
+        ops: List[Dict[str, Any]],
+        stop_on_error: bool = True,
+        ctx: Context = None
+    ) -> str:
+        """
+        Run several tool calls in order, in a single request to Revit.
+
+        Use this instead of making 3 or more separate calls in a row - e.g.
+        create_sheet, then place_view_on_sheet, then batch_update. When the
+        Revit extension supports it, all operations run in one transaction.
+
+        Supported tool_name values: batch_update, create_sheet,
+        place_view_on_sheet, create_walls_at_lines, batch_family_placement,
+        get_element_parameter, set_element_parameter, get_all_parameters,
+        set_parameters_bulk, set_parameters_multi_elements, quick_count,
+        color_splash, clear_colors
+
+        Args:
+            ops: List of operations, each containing:
+                - tool_name: One of the supported tools above
+                - args: Dict of arguments, same names and defaults as the
+                        tool's arguments (force, soa and no_cache don't apply)
+            stop_on_error: Skip the remaining operations after one fails
+                           (default: True)
+
+        Args are checked before anything is sent; an invalid operation fails
+        the whole batch. Payloads use mm units and row layout.
+
+        Returns:
+            JSON list with one result per operation, in order. A
+            set_parameters_multi_elements op larger than REVIT_MULTI_CHUNK
+            elements is sent as one request per chunk, each with its own result.
+
+        Example:
+            submit_batch([
+                {"tool_name": "create_sheet", "args": {"sheet_number": "A-101", "sheet_name": "Plans"}},
+                {"tool_name": "place_view_on_sheet", "args": {"sheet_number": "A-101", "view_name": "Level 1"}},
+                {"tool_name": "set_element_parameter",
+                 "args": {"element_id": 12345, "parameter_name": "Mark", "value": "A-101"}}
+            ])
+        """
+        unknown = [op.get("tool_name") for op in ops if op.get("tool_name") not in BATCH_ENDPOINTS]
+        if unknown:
+            return format_response({"error": "Tools not supported in a batch: {}".format(unknown)})
+
+        if ctx:
+            log(ctx, "Submitting batch of {} operations".format(len(ops)))
+
+        requests = []
+        for index, op in enumerate(ops):
+            endpoint, build = BATCH_ENDPOINTS[op["tool_name"]]
+            try:
+                payload = build(**(op.get("args") or {}))
+            except (TypeError, ValueError) as e:
+                return format_response({"error": "Operation {} ({}): {}".format(index, op["tool_name"], e)})
+            payloads = payload if isinstance(payload, list) else [payload]
+            requests.extend({"endpoint": endpoint, "payload": data} for data in payloads)
+
+        if await server_supports(revit_get, "rpc_batch", ctx):
+            data = {"ops": requests, "stop_on_error": stop_on_error}
+            response = await revit_post("/rpc_batch/", data, ctx, timeout=120.0)
+            invalidate()
+            return format_response(response)
+
+        # Older extensions: run the operations one by one
+        results = []
+        for request in requests:
+            response = await revit_post(request["endpoint"], request["payload"], ctx)
+            results.append(response)
+            if stop_on_error and is_error(response):
+                break
+        invalidate()
+
+        return format_response({
+            "completed": len(results),
+            "total": len(requests),
+            "results": results
+        })
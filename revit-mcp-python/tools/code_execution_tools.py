@@ -1,20 +1,29 @@
 # -*- coding: utf-8 -*-
 """Code execution tools for the MCP server."""
 
+import hashlib
+from typing import Optional
+
 from fastmcp import Context
-from .utils import format_response
+from .utils import format_response, invalidate, is_error, log, server_supports, unwrap_response
 
 
 def register_code_execution_tools(mcp, revit_get, revit_post, revit_image=None):
     """Register code execution tools with the MCP server."""
-    # Note: revit_get and revit_image are unused but kept for interface consistency
-    _ = revit_get, revit_image  # Acknowledge unused parameters
+    # Note: revit_image is unused but kept for interface consistency
+    _ = revit_image  # Acknowledge unused parameter
+
+    # Cache key -> hash of the code this process last compiled under it, so the
+    # source is only omitted when it is unchanged. The extension's cache is shared
+    # with other sessions, so code_hash is always sent and checked there too
+    compiled_keys = {}
 
     @mcp.tool()
     async def execute_revit_code(
         code: str,
         description: str = "Code execution",
         use_transaction: bool = True,
+        cache_key: Optional[str] = None,
         ctx: Context = None
     ) -> str:
         """
@@ -36,6 +45,10 @@ def register_code_execution_tools(mcp, revit_get, revit_post, revit_image=None):
                            Set to False for read-only operations to improve performance.
                            Set to True when modifying the model (creating/deleting elements,
                            changing parameters, etc.)
+            cache_key: Optional name for the compiled code. Defaults to a hash of
+                       the code, so re-running the same snippet skips recompiling
+                       it inside Revit (when the extension supports it). Code
+                       compiled under the key is only reused if its hash matches.
             ctx: MCP context for logging
 
         Returns:
@@ -76,13 +89,55 @@ def register_code_execution_tools(mcp, revit_get, revit_post, revit_image=None):
 
             if ctx:
                 trans_info = "with transaction" if use_transaction else "without transaction"
-                ctx.info("Executing code ({}): {}".format(trans_info, description))
+                log(ctx, "Executing code ({}): {}".format(trans_info, description))
+
+            if await server_supports(revit_get, "code_cache", ctx):
+                code_hash = hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+                key = cache_key or code_hash
+                payload["cache_key"] = key
+                payload["code_hash"] = code_hash
+                if compiled_keys.get(key) == code_hash:
+                    del payload["code"]
+                response = await revit_post("/execute_code/", payload, ctx, timeout=60.0)
 
-            response = await revit_post("/execute_code/", payload, ctx, timeout=60.0)
+                # The extension was restarted, evicted the entry or holds other code
+                # under this key (compiled by another session): send the source again
+                result = unwrap_response(response)
+                if isinstance(result, dict) and result.get("cache_miss"):
+                    payload["code"] = code
+                    response = await revit_post("/execute_code/", payload, ctx, timeout=60.0)
+                if is_error(response):
+                    compiled_keys.pop(key, None)
+                else:
+                    compiled_keys[key] = code_hash
+            else:
+                response = await revit_post("/execute_code/", payload, ctx, timeout=60.0)
+
+            # The code may change the model even without use_transaction (it can
+            # open its own Transaction), so cached replies can't be trusted after it
+            if not is_error(response):
+                invalidate()
             return format_response(response)
 
         except (ConnectionError, ValueError, RuntimeError) as e:
             error_msg = "Error during code execution: {}".format(str(e))
             if ctx:
-                ctx.error(error_msg)
+                log(ctx, error_msg, "error")
             return error_msg
+
+    @mcp.tool()
+    async def clear_code_cache(ctx: Context = None) -> str:
+        """
+        Drop all compiled code cached by execute_revit_code.
+
+        Only needed to free memory inside Revit.
+
+        Returns:
+            Confirmation of the cleared cache
+        """
+        compiled_keys.clear()
+        if not await server_supports(revit_get, "code_cache", ctx):
+            return "Code cache not supported by the Revit extension - nothing to clear"
+
+        response = await revit_post("/clear_code_cache/", {}, ctx)
+        return format_response(response)
@@ -3,7 +3,8 @@
 
 from fastmcp import Context
 from typing import Dict, Any, Optional, List
-from .utils import format_response
+from .payloads import clear_colors_payload, color_splash_payload
+from .utils import format_response, log
 
 
 def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
@@ -35,16 +36,10 @@ def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
             Results of the coloring operation including statistics and color assignments
         """
         try:
-            data = {
-                "category_name": category_name,
-                "parameter_name": parameter_name,
-                "use_gradient": use_gradient,
-            }
+            data = color_splash_payload(category_name, parameter_name, use_gradient, custom_colors)
 
-            if custom_colors:
-                data["custom_colors"] = custom_colors
-
-            ctx.info(
+            log(
+                ctx,
                 "Color splashing {} elements by {}".format(
                     category_name, parameter_name
                 )
@@ -54,7 +49,7 @@ def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
 
         except Exception as e:
             error_msg = "Error applying color splash: {}".format(str(e))
-            ctx.error(error_msg)
+            log(ctx, error_msg, "error")
             return error_msg
 
     @mcp.tool()
@@ -73,15 +68,15 @@ def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
             Results of the clear operation including count of elements processed
         """
         try:
-            data = {"category_name": category_name}
+            data = clear_colors_payload(category_name)
 
-            ctx.info("Clearing color overrides for {} elements".format(category_name))
+            log(ctx, "Clearing color overrides for {} elements".format(category_name))
             response = await revit_post("/clear_colors/", data, ctx)
             return format_response(response)
 
         except Exception as e:
             error_msg = "Error clearing colors: {}".format(str(e))
-            ctx.error(error_msg)
+            log(ctx, error_msg, "error")
             return error_msg
 
     @mcp.tool()
@@ -102,7 +97,8 @@ def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
         try:
             data = {"category_name": category_name}
 
-            ctx.info(
+            log(
+                ctx,
                 "Getting available parameters for {} category".format(category_name)
             )
             response = await revit_post("/list_category_parameters/", data, ctx)
@@ -110,5 +106,5 @@ def register_colors_tools(mcp, revit_get, revit_post, revit_image=None):
 
         except Exception as e:
             error_msg = "Error listing category parameters: {}".format(str(e))
-            ctx.error(error_msg)
+            log(ctx, error_msg, "error")
             return error_msg
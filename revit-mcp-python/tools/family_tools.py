@@ -3,7 +3,12 @@
 
 from fastmcp import Context
 from typing import Dict, Any, List, Optional
-from .utils import format_response
+from .models import WorkPlanePlacement
+from .payloads import WORKPLANE_FEET_FIELDS, rows_to_feet, to_columns, with_rotation
+from .utils import batch_post_options, cached_get, format_response, invalidate, log, server_supports
+
+# Family lists only change when families are loaded, so repeat lookups are cached briefly
+FAMILY_LIST_TTL = 30.0
 
 
 def register_family_tools(mcp, revit_get, revit_post):
@@ -31,12 +36,15 @@ def register_family_tools(mcp, revit_get, revit_post):
             "properties": properties or {},
         }
         response = await revit_post("/place_family/", data, ctx)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
     async def place_workplane_families(
         symbol_id: int,
-        placements: List[Dict[str, Any]],
+        placements: List[WorkPlanePlacement],
+        precomputed_rotation: bool = True,
+        force: bool = False,
         ctx: Context = None,
     ) -> str:
         """
@@ -56,6 +64,11 @@ def register_family_tools(mcp, revit_get, revit_post):
                 - normal_z: Z component of wall normal vector (usually 0)
                 - rotate_180: Optional, 1 to rotate 180 degrees (default: 0)
                 - mark: Optional, Mark parameter value
+            precomputed_rotation: Send each placement's rotation instead of
+                                  letting Revit derive it per row (default: True)
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
 
         Returns:
             JSON with placed element IDs and any failures
@@ -77,14 +90,25 @@ def register_family_tools(mcp, revit_get, revit_post):
             )
         """
         if ctx:
-            ctx.info("Placing {} WorkPlaneBased families with symbol {}".format(
+            log(ctx, "Placing {} WorkPlaneBased families with symbol {}".format(
                 len(placements), symbol_id))
 
+        rows = [placement.model_dump(exclude_none=True) for placement in placements]
         data = {
             "symbol_id": symbol_id,
-            "placements": placements
+            "placements": rows
         }
-        response = await revit_post("/place_workplane_families/", data, ctx, timeout=120.0)
+        if await server_supports(revit_get, "feet_units", ctx):
+            data["placements"] = rows_to_feet(rows, WORKPLANE_FEET_FIELDS)
+            data["units"] = "feet"
+        if precomputed_rotation and await server_supports(revit_get, "precomputed_rotation", ctx):
+            data["placements"] = with_rotation(data["placements"], lambda p: bool(p.get("rotate_180")))
+        if await server_supports(revit_get, "columnar_payloads", ctx):
+            data["placements"] = to_columns(data["placements"])
+            data["layout"] = "columns"
+        options = await batch_post_options(revit_get, ctx, timeout=120.0)
+        response = await revit_post("/place_workplane_families/", data, ctx, idempotent=not force, **options)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
@@ -98,11 +122,19 @@ def register_family_tools(mcp, revit_get, revit_post):
         if limit != 50:
             params["limit"] = str(limit)
 
-        result = await revit_get("/list_families/", ctx, params=params)
+        result = await cached_get(
+            ("list_families", contains, limit),
+            FAMILY_LIST_TTL,
+            lambda: revit_get("/list_families/", ctx, params=params),
+        )
         return format_response(result)
 
     @mcp.tool()
     async def list_family_categories(ctx: Context = None) -> str:
         """Get a list of all family categories in the current Revit model"""
-        response = await revit_get("/list_family_categories/", ctx)
+        response = await cached_get(
+            ("list_family_categories",),
+            FAMILY_LIST_TTL,
+            lambda: revit_get("/list_family_categories/", ctx),
+        )
         return format_response(response)
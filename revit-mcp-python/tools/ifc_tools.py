@@ -3,7 +3,8 @@
 
 from fastmcp import Context
 from typing import Optional, List
-from .utils import format_response
+from .models import IfcElementRef
+from .utils import format_response, gather_limited, is_error, log, server_supports, unwrap_response
 
 
 def register_ifc_tools(mcp, revit_get, revit_post):
@@ -58,6 +59,9 @@ def register_ifc_tools(mcp, revit_get, revit_post):
 
             # Find IfcWindow elements
             query_ifc_elements(ifc_class="IfcWindow")
+
+        Prefer query_ifc_with_properties when full properties are needed for
+        the matches - it avoids one get_ifc_element_properties call per element.
         """
         if ctx:
             filters = []
@@ -69,7 +73,7 @@ def register_ifc_tools(mcp, revit_get, revit_post):
                 filters.append("ifc_class={}".format(ifc_class))
             if parameter_name:
                 filters.append("{}={}".format(parameter_name, parameter_value or "*"))
-            ctx.info("Querying IFC elements: {}".format(", ".join(filters) if filters else "all"))
+            log(ctx, "Querying IFC elements: {}".format(", ".join(filters) if filters else "all"))
 
         data = {
             "link_name": link_name,
@@ -111,7 +115,7 @@ def register_ifc_tools(mcp, revit_get, revit_post):
             get_ifc_element_properties(link_instance_id=12345, element_id=67890)
         """
         if ctx:
-            ctx.info("Getting properties for element {} in link {}".format(element_id, link_instance_id))
+            log(ctx, "Getting properties for element {} in link {}".format(element_id, link_instance_id))
 
         data = {
             "link_instance_id": link_instance_id,
@@ -120,5 +124,122 @@ def register_ifc_tools(mcp, revit_get, revit_post):
         response = await revit_post("/get_ifc_element_properties/", data, ctx)
         return format_response(response)
 
+    @mcp.tool()
+    async def get_ifc_element_properties_bulk(
+        elements: List[IfcElementRef],
+        ctx: Context = None
+    ) -> str:
+        """
+        Get all properties for several elements in linked IFC models at once.
+
+        Requests run concurrently, so this is much faster than calling
+        get_ifc_element_properties once per element.
+
+        Args:
+            elements: List of elements, each containing:
+                - link_instance_id: ID of the RevitLinkInstance
+                - element_id: ID of the element within the linked model
+
+        Returns:
+            JSON list with the properties (or error) for each element, in order
+
+        Example:
+            get_ifc_element_properties_bulk([
+                {"link_instance_id": 12345, "element_id": 67890},
+                {"link_instance_id": 12345, "element_id": 67891}
+            ])
+        """
+        if ctx:
+            log(ctx, "Getting properties for {} IFC elements".format(len(elements)))
+
+        responses = await gather_limited([
+            lambda e=e: revit_post(
+                "/get_ifc_element_properties/",
+                {"link_instance_id": e.link_instance_id, "element_id": e.element_id},
+                ctx
+            )
+            for e in elements
+        ])
+        results = [
+            {
+                "link_instance_id": e.link_instance_id,
+                "element_id": e.element_id,
+                "properties": unwrap_response(response)
+            }
+            for e, response in zip(elements, responses)
+        ]
+        return format_response({"count": len(results), "results": results})
+
+    @mcp.tool()
+    async def query_ifc_with_properties(
+        link_name: str = "",
+        category: str = "",
+        ifc_class: str = "",
+        parameter_name: str = "",
+        parameter_value: str = "",
+        include_properties: bool = True,
+        max_results: int = 20,
+        ctx: Context = None
+    ) -> str:
+        """
+        Search linked IFC models and return full properties for each match.
+
+        Combines query_ifc_elements with get_ifc_element_properties for every
+        matching element, in a single call. Filters work exactly like
+        query_ifc_elements.
+
+        Args:
+            link_name: Filter by linked model name (partial match, case-insensitive)
+            category: Revit category name to filter on (e.g. "Windows", "Doors")
+            ifc_class: IFC class/type to filter on (e.g. "IfcWindow")
+            parameter_name: Parameter name to search for
+            parameter_value: Value to match (partial match for strings)
+            include_properties: Attach all instance and type parameters to each
+                                element (default: True)
+            max_results: Maximum number of elements to return (default: 20)
+
+        Returns:
+            JSON with matching elements, each with a "properties" entry
+
+        Example:
+            query_ifc_with_properties(category="Doors", max_results=5)
+        """
+        if ctx:
+            log(ctx, "Querying IFC elements with properties (max {})".format(max_results))
+
+        data = {
+            "link_name": link_name,
+            "category": category,
+            "ifc_class": ifc_class,
+            "parameter_name": parameter_name,
+            "parameter_value": parameter_value,
+            "max_results": max_results,
+            "include_properties": include_properties
+        }
+
+        if await server_supports(revit_get, "query_ifc_with_properties", ctx):
+            response = await revit_post("/query_ifc_with_properties/", data, ctx)
+            return format_response(response)
+
+        # Older extensions: query first, then fetch properties per element
+        del data["include_properties"]
+        response = await revit_post("/query_ifc_elements/", data, ctx)
+        result = unwrap_response(response)
+        if is_error(response) or not include_properties:
+            return format_response(response)
+
+        elements = [e for e in result.get("elements") or [] if "link_instance_id" in e and "element_id" in e]
+        properties = await gather_limited([
+            lambda e=e: revit_post(
+                "/get_ifc_element_properties/",
+                {"link_instance_id": e["link_instance_id"], "element_id": e["element_id"]},
+                ctx
+            )
+            for e in elements
+        ])
+        for element, props in zip(elements, properties):
+            element["properties"] = unwrap_response(props)
+        return format_response(result)
+
     # NOTE: get_link_status is registered in selection_tools.py
     # Removed duplicate registration to avoid MCP tool conflicts
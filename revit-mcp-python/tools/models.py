@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Typed tool arguments for the batch tools.
+
+FastMCP builds one validator per tool signature when it is registered, so
+declaring rows as models validates each row once into a fixed shape instead of
+passing loose dicts through to the payload builders. Placement rows allow
+extra keys (e.g. family-specific fields), which are forwarded unchanged.
+"""
+
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class ElementUpdate(BaseModel):
+    """Parameter changes for one element in batch_update"""
+
+    model_config = ConfigDict(frozen=True)
+
+    element_id: int
+    parameters: Dict[str, Any]
+
+
+class IfcElementRef(BaseModel):
+    """One element in a linked IFC model for get_ifc_element_properties_bulk"""
+
+    model_config = ConfigDict(frozen=True)
+
+    link_instance_id: int
+    element_id: int
+
+
+class WorkPlanePlacement(BaseModel):
+    """One WorkPlaneBased family instance for place_workplane_families"""
+
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    x_mm: float
+    y_mm: float
+    z_mm: float
+    normal_x: float
+    normal_y: float
+    normal_z: float = 0.0
+    rotate_180: int = 0
+    mark: Optional[str] = None
+
+
+class WindowPlacement(BaseModel):
+    """One window for place_workplane_windows"""
+
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    x_mm: float
+    y_mm: float
+    z_mm: float
+    normal_x: float
+    normal_y: float
+    mark: Optional[str] = None
+
+
+class FamilyPlacement(BaseModel):
+    """One family instance for batch_family_placement (coordinates in mm)"""
+
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    x: float
+    y: float
+    z: float = 0.0
+    rotation: float = 0.0
@@ -3,7 +3,13 @@
 
 from fastmcp import Context
 from typing import Optional, List, Dict, Any
-from .utils import format_response
+from .models import ElementUpdate, FamilyPlacement, WindowPlacement
+from .payloads import (
+    FAMILY_FEET_FIELDS, MM_PER_FOOT, WORKPLANE_FEET_FIELDS,
+    batch_update_payload, create_sheet_payload, family_placement_payload, place_view_payload, walls_payload,
+    lines_to_feet, lines_to_polylines, rows_to_feet, to_columns, updates_to_columns, with_rotation,
+)
+from .utils import batch_post_options, format_response, invalidate, is_error, log, server_supports
 
 
 def register_modification_tools(mcp, revit_get, revit_post):
@@ -11,18 +17,27 @@ def register_modification_tools(mcp, revit_get, revit_post):
 
     @mcp.tool()
     async def batch_update(
-        updates: List[Dict[str, Any]],
+        updates: List[ElementUpdate],
+        soa: bool = True,
+        expected_values: Optional[Dict[int, Dict[str, Any]]] = None,
         ctx: Context = None
     ) -> str:
         """
         Batch update parameters on multiple elements in a single transaction.
 
         Efficient way to update many parameters across multiple elements at once.
+        Entries for the same element are merged (later values win) before sending.
 
         Args:
             updates: List of update objects, each containing:
                 - element_id: The element ID to update
                 - parameters: Dict of parameter_name -> new_value pairs
+            soa: Send the updates as parallel arrays (element_ids, param_names,
+                 values), which is much smaller for large batches. Only used when
+                 the Revit extension supports it (default: True)
+            expected_values: Optional current values as {element_id: {parameter: value}},
+                             e.g. from get_all_parameters. Parameters that already
+                             have the new value are skipped.
 
         Returns:
             JSON with success/failure counts and detailed results
@@ -34,11 +49,19 @@ def register_modification_tools(mcp, revit_get, revit_post):
                 {"element_id": 12347, "parameters": {"Mark": "A-103", "Level": "Ground Floor"}}
             ])
         """
+        data = batch_update_payload(updates, expected_values)
+        if not data["updates"]:
+            return format_response({"status": "success", "message": "Nothing to update - all values unchanged"})
+
         if ctx:
-            ctx.info("Batch updating {} elements".format(len(updates)))
+            log(ctx, "Batch updating {} elements".format(len(data["updates"])))
 
-        data = {"updates": updates}
+        if soa and await server_supports(revit_get, "columnar_payloads", ctx):
+            columns = updates_to_columns(data["updates"])
+            if columns is not None:
+                data = dict(columns, layout="columns")
         response = await revit_post("/batch_update/", data, ctx)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
@@ -46,6 +69,7 @@ def register_modification_tools(mcp, revit_get, revit_post):
         sheet_number: str,
         sheet_name: str = "New Sheet",
         title_block_name: str = "",
+        force: bool = False,
         ctx: Context = None
     ) -> str:
         """
@@ -56,24 +80,26 @@ def register_modification_tools(mcp, revit_get, revit_post):
             sheet_name: The sheet name/title (default: "New Sheet")
             title_block_name: Name of title block family to use (partial match).
                             If empty, uses the first available title block.
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
 
         Returns:
             JSON with new sheet ID and details
 
         Example:
             create_sheet("A-101", "Floor Plan - Level 1", "A1 metric")
+
+        Prefer create_sheet_with_views when views are placed on the new sheet
+        right away - it does both in a single call. For longer sequences of
+        modifications, use submit_batch.
         """
         if ctx:
-            ctx.info("Creating sheet {} - {}".format(sheet_number, sheet_name))
-
-        data = {
-            "sheet_number": sheet_number,
-            "sheet_name": sheet_name
-        }
-        if title_block_name:
-            data["title_block_name"] = title_block_name
+            log(ctx, "Creating sheet {} - {}".format(sheet_number, sheet_name))
 
-        response = await revit_post("/create_sheet/", data, ctx)
+        data = create_sheet_payload(sheet_number, sheet_name, title_block_name)
+        response = await revit_post("/create_sheet/", data, ctx, idempotent=not force)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
@@ -108,24 +134,97 @@ def register_modification_tools(mcp, revit_get, revit_post):
 
             # By names
             place_view_on_sheet(sheet_number="A-101", view_name="Level 1")
+
+        Prefer create_sheet_with_views when the sheet is created in the same
+        step - it places all views in a single call. For longer sequences of
+        modifications, use submit_batch.
         """
         if ctx:
             identifier = sheet_number or str(sheet_id)
-            ctx.info("Placing view on sheet {}".format(identifier))
-
-        data = {"x": x, "y": y}
-        if sheet_id:
-            data["sheet_id"] = sheet_id
-        if view_id:
-            data["view_id"] = view_id
-        if sheet_number:
-            data["sheet_number"] = sheet_number
-        if view_name:
-            data["view_name"] = view_name
+            log(ctx, "Placing view on sheet {}".format(identifier))
 
+        data = place_view_payload(sheet_id, view_id, sheet_number, view_name, x, y)
         response = await revit_post("/place_view_on_sheet/", data, ctx)
+        invalidate()
         return format_response(response)
 
+    @mcp.tool()
+    async def create_sheet_with_views(
+        sheet_number: str,
+        sheet_name: str = "New Sheet",
+        title_block_name: str = "",
+        views: List[Dict[str, Any]] = None,
+        force: bool = False,
+        ctx: Context = None
+    ) -> str:
+        """
+        Create a sheet and place views on it in one call.
+
+        Replaces a create_sheet call followed by one place_view_on_sheet call
+        per view. All work runs in a single Revit transaction when the
+        extension supports it.
+
+        Args:
+            sheet_number: The sheet number (e.g., "A-101", "S-001")
+            sheet_name: The sheet name/title (default: "New Sheet")
+            title_block_name: Name of title block family to use (partial match).
+                            If empty, uses the first available title block.
+            views: List of views to place, each containing:
+                - view_id or view_name: The view to place
+                - x: Optional X position on sheet in feet (default: 1.0)
+                - y: Optional Y position on sheet in feet (default: 0.75)
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
+
+        Returns:
+            JSON with the new sheet and the placed viewports
+
+        Example:
+            create_sheet_with_views(
+                "A-101",
+                "Floor Plans",
+                views=[
+                    {"view_name": "Level 1", "x": 0.8, "y": 0.75},
+                    {"view_name": "Level 2", "x": 2.0, "y": 0.75}
+                ]
+            )
+        """
+        views = views or []
+        if ctx:
+            log(ctx, "Creating sheet {} with {} views".format(sheet_number, len(views)))
+
+        data = {
+            "sheet_number": sheet_number,
+            "sheet_name": sheet_name,
+            "views": views
+        }
+        if title_block_name:
+            data["title_block_name"] = title_block_name
+
+        if await server_supports(revit_get, "create_sheet_with_views", ctx):
+            response = await revit_post("/create_sheet_with_views/", data, ctx, idempotent=not force)
+            invalidate()
+            return format_response(response)
+
+        # Older extensions: create the sheet, then place each view by sheet number
+        sheet_data = {k: v for k, v in data.items() if k != "views"}
+        sheet = await revit_post("/create_sheet/", sheet_data, ctx, idempotent=not force)
+        invalidate()
+        if is_error(sheet):
+            return format_response(sheet)
+
+        viewports = []
+        for view in views:
+            view_data = {"sheet_number": sheet_number, "x": view.get("x", 1.0), "y": view.get("y", 0.75)}
+            if view.get("view_id"):
+                view_data["view_id"] = view["view_id"]
+            if view.get("view_name"):
+                view_data["view_name"] = view["view_name"]
+            viewports.append(await revit_post("/place_view_on_sheet/", view_data, ctx))
+
+        return format_response({"sheet": sheet, "viewports": viewports})
+
     @mcp.tool()
     async def create_walls_at_lines(
         line_ids: List[int] = None,
@@ -134,6 +233,7 @@ def register_modification_tools(mcp, revit_get, revit_post):
         level_name: str = "",
         height: float = 3000,
         structural: bool = False,
+        force: bool = False,
         ctx: Context = None
     ) -> str:
         """
@@ -150,6 +250,9 @@ def register_modification_tools(mcp, revit_get, revit_post):
             level_name: Level name (partial match). Uses lowest level if empty.
             height: Wall height in millimeters (default: 3000)
             structural: Whether walls are structural (default: False)
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
 
         Returns:
             JSON with created wall IDs and any failures
@@ -173,28 +276,28 @@ def register_modification_tools(mcp, revit_get, revit_post):
         """
         if ctx:
             count = len(line_ids or []) + len(lines or [])
-            ctx.info("Creating walls from {} lines".format(count))
-
-        data = {
-            "line_ids": line_ids or [],
-            "lines": lines or [],
-            "height": height,
-            "structural": structural
-        }
-        if wall_type_name:
-            data["wall_type_name"] = wall_type_name
-        if level_name:
-            data["level_name"] = level_name
-
-        response = await revit_post("/create_walls_at_lines/", data, ctx)
+            log(ctx, "Creating walls from {} lines".format(count))
+
+        data = walls_payload(line_ids, lines, wall_type_name, level_name, height, structural)
+        if await server_supports(revit_get, "feet_units", ctx):
+            data["lines"] = lines_to_feet(data["lines"])
+            data["height"] = height / MM_PER_FOOT
+            data["units"] = "feet"
+        if data["lines"] and await server_supports(revit_get, "wall_polylines", ctx):
+            data.update(lines_to_polylines(data.pop("lines")))
+            data["format_version"] = 2
+
+        response = await revit_post("/create_walls_at_lines/", data, ctx, idempotent=not force)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
     async def batch_family_placement(
         family_name: str,
-        placements: List[Dict[str, float]],
+        placements: List[FamilyPlacement],
         type_name: str = "",
         level_name: str = "",
+        force: bool = False,
         ctx: Context = None
     ) -> str:
         """
@@ -210,6 +313,9 @@ def register_modification_tools(mcp, revit_get, revit_post):
                        - rotation: optional rotation in degrees (default: 0)
             type_name: Specific family type to use (partial match, optional)
             level_name: Level to place on (partial match, optional)
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
 
         Returns:
             JSON with placed instance IDs and any failures
@@ -228,24 +334,27 @@ def register_modification_tools(mcp, revit_get, revit_post):
             )
         """
         if ctx:
-            ctx.info("Placing {} instances of family '{}'".format(len(placements), family_name))
-
-        data = {
-            "family_name": family_name,
-            "placements": placements
-        }
-        if type_name:
-            data["type_name"] = type_name
-        if level_name:
-            data["level_name"] = level_name
-
-        response = await revit_post("/batch_family_placement/", data, ctx)
+            log(ctx, "Placing {} instances of family '{}'".format(len(placements), family_name))
+
+        data = family_placement_payload(family_name, placements, type_name, level_name)
+        if await server_supports(revit_get, "feet_units", ctx):
+            data["placements"] = rows_to_feet(data["placements"], FAMILY_FEET_FIELDS)
+            data["units"] = "feet"
+        if await server_supports(revit_get, "columnar_payloads", ctx):
+            data["placements"] = to_columns(data["placements"])
+            data["layout"] = "columns"
+
+        options = await batch_post_options(revit_get, ctx)
+        response = await revit_post("/batch_family_placement/", data, ctx, idempotent=not force, **options)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
     async def place_workplane_windows(
         symbol_id: int,
-        placements: List[Dict[str, Any]],
+        placements: List[WindowPlacement],
+        precomputed_rotation: bool = True,
+        force: bool = False,
         ctx: Context = None
     ) -> str:
         """
@@ -265,6 +374,11 @@ def register_modification_tools(mcp, revit_get, revit_post):
                 - normal_x: X component of wall normal vector
                 - normal_y: Y component of wall normal vector
                 - mark: Optional Mark parameter value
+            precomputed_rotation: Send each window's rotation instead of letting
+                                  Revit derive it per row (default: True)
+            force: Run even if an identical request was just sent (default: False).
+                   Otherwise a retried identical request returns the earlier
+                   result instead of creating duplicates.
 
         Returns:
             JSON with placed element IDs, marks, and any failures
@@ -298,14 +412,22 @@ def register_modification_tools(mcp, revit_get, revit_post):
             - Windows with positive normal_y are automatically rotated 180°
         """
         if ctx:
-            ctx.info("Placing {} windows with symbol {}".format(
+            log(ctx, "Placing {} windows with symbol {}".format(
                 len(placements), symbol_id))
 
+        rows = [placement.model_dump(exclude_none=True) for placement in placements]
         data = {
             "symbol_id": symbol_id,
-            "placements": placements
+            "placements": rows
         }
-        response = await revit_post("/place_workplane_windows/", data, ctx, timeout=120.0)
+        if await server_supports(revit_get, "feet_units", ctx):
+            data["placements"] = rows_to_feet(rows, WORKPLANE_FEET_FIELDS)
+            data["units"] = "feet"
+        if precomputed_rotation and await server_supports(revit_get, "precomputed_rotation", ctx):
+            data["placements"] = with_rotation(data["placements"], lambda p: p.get("normal_y", 0) > 0)
+        options = await batch_post_options(revit_get, ctx, timeout=120.0)
+        response = await revit_post("/place_workplane_windows/", data, ctx, idempotent=not force, **options)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
@@ -348,7 +470,7 @@ def register_modification_tools(mcp, revit_get, revit_post):
             coordinate_converter(100, 200, from_system="internal", to_system="shared")
         """
         if ctx:
-            ctx.info("Converting coordinates from {} {} to {} {}".format(
+            log(ctx, "Converting coordinates from {} {} to {} {}".format(
                 from_unit, from_system, to_unit, to_system))
 
         data = {
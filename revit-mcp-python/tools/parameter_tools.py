@@ -1,14 +1,77 @@
 # -*- coding: utf-8 -*-
 """Parameter tools for reading and writing Revit element parameters"""
 
+import asyncio
+
+import orjson
 from fastmcp import Context
 from typing import Dict, Any, List, Optional
-from .utils import format_response
+from .utils import (
+    ELEMENT_CACHE_TTL,
+    ParameterReadBatcher,
+    ParameterWriteCoalescer,
+    cached_get,
+    combine_chunk_responses,
+    format_response,
+    gather_limited,
+    invalidate,
+    is_error,
+    log,
+    response_cache,
+    server_supports,
+    unwrap_response,
+)
+from .payloads import (
+    all_parameters_payload,
+    bulk_parameters_payload,
+    check_parameter_names,
+    get_parameter_payload,
+    multi_parameters_payloads,
+)
+
+MULTI_CHUNK_CONCURRENCY = 4
+
+
+def _remember_parameters(element_id, response):
+    """Index a get_all_parameters reply by lowercased name for get_element_parameter
+
+    The index is one cache entry per element: {"instance": {name: parameter},
+    "type": {name: parameter}}, so a lookup is a dict probe per group.
+    """
+    if is_error(response):
+        return
+    payload = unwrap_response(response)
+    key = ("element_parameters", element_id)
+    index = response_cache.get(key) or {"instance": {}, "type": {}}
+    for group, list_name in (("instance", "instance_parameters"), ("type", "type_parameters")):
+        for parameter in payload.get(list_name) or []:
+            name = parameter.get("parameter_name") or parameter.get("name")
+            if name:
+                index[group][name.lower()] = parameter
+    response_cache.put(key, index, ELEMENT_CACHE_TTL)
+
+
+def _lookup_parameter(element_id, parameter_name):
+    """Return a cached parameter (instance before type), or None
+
+    Only valid when the extension advertises "uniform_parameter_replies": its
+    get_all_parameters entries then have the same shape as a /get_parameter/
+    reply, so a hit is indistinguishable from a round trip.
+    """
+    index = response_cache.get(("element_parameters", element_id))
+    if index is None:
+        return None
+    name = parameter_name.lower()
+    parameter = index["instance"].get(name) or index["type"].get(name)
+    return parameter
 
 
 def register_parameter_tools(mcp, revit_get, revit_post):
     """Register parameter-related tools"""
 
+    read_batcher = ParameterReadBatcher(revit_post)
+    write_coalescer = ParameterWriteCoalescer(revit_post)
+
     @mcp.tool()
     async def get_element_parameter(
         element_id: int,
@@ -34,12 +97,19 @@ def register_parameter_tools(mcp, revit_get, revit_post):
             get_element_parameter(12345, "Comments")
         """
         if ctx:
-            ctx.info(f"Getting parameter '{parameter_name}' from element {element_id}")
+            log(ctx, f"Getting parameter '{parameter_name}' from element {element_id}")
+
+        # Answer from a recent get_all_parameters on the same element if possible
+        if await server_supports(revit_get, "uniform_parameter_replies", ctx):
+            cached = _lookup_parameter(element_id, parameter_name)
+            if cached is not None:
+                return format_response(cached)
 
-        data = {
-            "element_id": element_id,
-            "parameter_name": parameter_name
-        }
+        if await server_supports(revit_get, "parameters_batch", ctx):
+            response = await read_batcher.get(element_id, parameter_name, ctx)
+            return format_response(response)
+
+        data = get_parameter_payload(element_id, parameter_name)
         response = await revit_post("/get_parameter/", data, ctx)
         return format_response(response)
 
@@ -71,18 +141,41 @@ def register_parameter_tools(mcp, revit_get, revit_post):
             set_element_parameter(12345, "Mark", "A-101")
             set_element_parameter(12345, "Comments", "Updated via MCP")
             set_element_parameter(12345, "Height", 2400)
+
+        Writes issued concurrently are coalesced: they are sent as one
+        set_parameters_bulk / set_parameters_multi_elements request, whose
+        result is returned to every caller it covers.
+
+        When making 3 or more modifications in a row, prefer submit_batch.
         """
         if ctx:
-            ctx.info(f"Setting parameter '{parameter_name}' = '{value}' on element {element_id}")
-
-        data = {
-            "element_id": element_id,
-            "parameter_name": parameter_name,
-            "value": value
-        }
-        response = await revit_post("/set_parameter/", data, ctx)
+            log(ctx, f"Setting parameter '{parameter_name}' = '{value}' on element {element_id}")
+
+        try:
+            check_parameter_names([parameter_name])
+        except ValueError as e:
+            return format_response({"error": str(e)})
+
+        response = await write_coalescer.set(element_id, parameter_name, value, ctx)
         return format_response(response)
 
+    @mcp.tool()
+    async def flush_parameter_writes(ctx: Context = None) -> str:
+        """
+        Send any buffered set_element_parameter writes immediately.
+
+        Buffered writes are normally flushed within a few milliseconds, so
+        this is only needed to make sure nothing is pending.
+
+        Returns:
+            JSON with the number of requests sent and their results
+        """
+        if ctx:
+            log(ctx, "Flushing buffered parameter writes")
+
+        responses = await write_coalescer.flush()
+        return format_response({"requests": len(responses), "results": responses})
+
     @mcp.tool()
     async def get_all_parameters(
         element_id: int,
@@ -108,14 +201,20 @@ def register_parameter_tools(mcp, revit_get, revit_post):
         then use get_element_parameter for specific values.
         """
         if ctx:
-            ctx.info(f"Getting all parameters from element {element_id}")
-
-        data = {
-            "element_id": element_id,
-            "include_empty": include_empty,
-            "include_readonly": include_readonly
-        }
-        response = await revit_post("/get_all_parameters/", data, ctx)
+            log(ctx, f"Getting all parameters from element {element_id}")
+
+        data = all_parameters_payload(element_id, include_empty, include_readonly)
+
+        async def fetch():
+            response = await revit_post("/get_all_parameters/", data, ctx)
+            _remember_parameters(element_id, response)
+            return response
+
+        response = await cached_get(
+            ("get_all_parameters", element_id, include_empty, include_readonly),
+            ELEMENT_CACHE_TTL,
+            fetch,
+        )
         return format_response(response)
 
     @mcp.tool()
@@ -145,13 +244,15 @@ def register_parameter_tools(mcp, revit_get, revit_post):
             })
         """
         if ctx:
-            ctx.info(f"Setting {len(parameters)} parameters on element {element_id}")
+            log(ctx, f"Setting {len(parameters)} parameters on element {element_id}")
+
+        try:
+            data = bulk_parameters_payload(element_id, parameters)
+        except ValueError as e:
+            return format_response({"error": str(e)})
 
-        data = {
-            "element_id": element_id,
-            "parameters": parameters
-        }
         response = await revit_post("/set_parameters_bulk/", data, ctx)
+        invalidate()
         return format_response(response)
 
     @mcp.tool()
@@ -163,6 +264,10 @@ def register_parameter_tools(mcp, revit_get, revit_post):
         """
         Set the same parameter(s) on multiple elements in one transaction.
 
+        The list is sent in requests of REVIT_MULTI_CHUNK elements (default
+        500), each its own transaction. For thousands of elements, set_parameters_multi_elements_stream reports
+        progress per chunk.
+
         Very efficient for bulk updates like:
         - Setting Mark on all windows in a view
         - Adding Comments to selected elements
@@ -173,7 +278,11 @@ def register_parameter_tools(mcp, revit_get, revit_post):
             parameters: Dictionary of parameter_name: value pairs
 
         Returns:
-            JSON with per-element results and summary
+            JSON with one result per chunk, as returned by Revit, and a summary:
+            {"status": "success" | "partial",
+             "summary": {"chunk_count": n, "element_count": total, "failed_chunks": [index]},
+             "chunks": [{"chunk": index, "element_count": n, "result": {...}}]}
+            If every chunk fails, the first error is returned.
 
         Example:
             set_parameters_multi_elements(
@@ -182,11 +291,74 @@ def register_parameter_tools(mcp, revit_get, revit_post):
             )
         """
         if ctx:
-            ctx.info(f"Setting parameters on {len(element_ids)} elements")
-
-        data = {
-            "element_ids": element_ids,
-            "parameters": parameters
-        }
-        response = await revit_post("/set_parameters_multi/", data, ctx)
+            log(ctx, f"Setting parameters on {len(element_ids)} elements")
+
+        try:
+            payloads = multi_parameters_payloads(element_ids, parameters)
+        except ValueError as e:
+            return format_response({"error": str(e)})
+
+        responses = await gather_limited([
+            lambda data=data: revit_post("/set_parameters_multi/", data, ctx)
+            for data in payloads
+        ], limit=MULTI_CHUNK_CONCURRENCY)
+        response = combine_chunk_responses(responses, [len(data["element_ids"]) for data in payloads])
+        invalidate()
         return format_response(response)
+
+    @mcp.tool()
+    async def set_parameters_multi_elements_stream(
+        element_ids: List[int],
+        parameters: Dict[str, Any],
+        ctx: Context = None
+    ) -> str:
+        """
+        Set the same parameter(s) on many elements, reporting each chunk as it completes.
+
+        Works like set_parameters_multi_elements, but sends a progress
+        notification after every chunk of REVIT_MULTI_CHUNK elements and
+        returns one JSON line per chunk as it completes.
+        Prefer this for large updates (thousands of elements).
+
+        Args:
+            element_ids: List of Revit element IDs
+            parameters: Dictionary of parameter_name: value pairs
+
+        Returns:
+            NDJSON, one line per chunk in completion order:
+            {"chunk": index, "element_count": n, "result": {...}}
+
+        Example:
+            set_parameters_multi_elements_stream(window_ids, {"Comments": "Checked"})
+        """
+        if ctx:
+            log(ctx, f"Setting parameters on {len(element_ids)} elements in chunks")
+
+        try:
+            chunks = multi_parameters_payloads(element_ids, parameters)
+        except ValueError as e:
+            return format_response({"error": str(e)})
+
+        semaphore = asyncio.Semaphore(MULTI_CHUNK_CONCURRENCY)
+
+        async def send(index, data):
+            async with semaphore:
+                return index, await revit_post("/set_parameters_multi/", data, ctx)
+
+        lines = []
+        pending = [send(index, data) for index, data in enumerate(chunks)]
+        for done, next_result in enumerate(asyncio.as_completed(pending), 1):
+            index, response = await next_result
+            count = len(chunks[index]["element_ids"])
+            line = {
+                "chunk": index,
+                "element_count": count,
+                "result": unwrap_response(response),
+            }
+            lines.append(orjson.dumps(line, default=str).decode("utf-8"))
+            if ctx:
+                log(ctx, f"Chunk {done}/{len(chunks)} done ({count} elements)")
+                await ctx.report_progress(done, len(chunks))
+
+        invalidate()
+        return "\n".join(lines) + "\n"
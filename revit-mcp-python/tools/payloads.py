@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""Helpers that reshape tool arguments into compact route payloads"""
+
+import math
+import os
+from collections import defaultdict
+
+from .models import ElementUpdate, FamilyPlacement
+
+# Revit's internal length unit is the foot
+MM_PER_FOOT = 304.8
+
+# mm input field -> feet output field for WorkPlaneBased placements
+WORKPLANE_FEET_FIELDS = {"x_mm": "x_ft", "y_mm": "y_ft", "z_mm": "z_ft"}
+
+# Family placements keep their field names; the payload's "units" marks them as feet
+FAMILY_FEET_FIELDS = {"x": "x", "y": "y", "z": "z"}
+
+# set_parameters_multi_elements sends at most this many elements per request
+MULTI_CHUNK_SIZE = int(os.environ.get("REVIT_MULTI_CHUNK", "500"))
+
+
+def rows_to_feet(rows, fields):
+    """Copy rows with millimetre fields converted to Revit's internal feet.
+
+    Args:
+        rows: List of flat dictionaries, e.g. placements
+        fields: Mapping of mm field name -> name of the converted field
+
+    Returns:
+        list: New dictionaries; fields missing from a row stay missing
+
+    Example:
+        rows_to_feet([{"x_mm": 304.8, "mark": "W-1"}], {"x_mm": "x_ft"})
+        # [{"x_ft": 1.0, "mark": "W-1"}]
+    """
+    converted = []
+    for row in rows:
+        new_row = {}
+        for key, value in row.items():
+            if key in fields:
+                new_row[fields[key]] = value / MM_PER_FOOT
+            else:
+                new_row[key] = value
+        converted.append(new_row)
+    return converted
+
+
+def lines_to_feet(lines):
+    """Copy wall line definitions ({"start": {...}, "end": {...}}) converted to feet"""
+    return [
+        {end: {axis: value / MM_PER_FOOT for axis, value in line[end].items()} for end in line}
+        for line in lines
+    ]
+
+
+def to_columns(rows):
+    """Convert a list of dicts (one per row) into parallel arrays.
+
+    Every key found in any row becomes a column; rows without that key get None.
+
+    Args:
+        rows: List of flat dictionaries, e.g. placements
+
+    Returns:
+        dict: {"count": len(rows), "columns": {key: [value per row]}}
+
+    Example:
+        to_columns([{"x": 1, "mark": "A"}, {"x": 2}])
+        # {"count": 2, "columns": {"x": [1, 2], "mark": ["A", None]}}
+    """
+    fields = {}
+    for row in rows:
+        for key in row:
+            fields.setdefault(key, None)
+    return {
+        "count": len(rows),
+        "columns": {key: [row.get(key) for row in rows] for key in fields},
+    }
+
+
+def merge_updates(updates, expected_values=None):
+    """Merge batch_update entries per element and drop writes that change nothing.
+
+    Later entries for the same element override earlier values. Elements keep the
+    order in which they first appear.
+
+    Args:
+        updates: List of ElementUpdate models
+        expected_values: Optional {element_id: {parameter_name: current_value}};
+                         parameters already at that value are skipped
+
+    Returns:
+        list: ElementUpdate models, one per element with something to change
+    """
+    merged = {}
+    for update in updates:
+        merged.setdefault(update.element_id, {}).update(update.parameters)
+
+    expected_values = expected_values or {}
+    result = []
+    for element_id, parameters in merged.items():
+        current = expected_values.get(element_id, {})
+        changes = {
+            name: value for name, value in parameters.items()
+            if name not in current or current[name] != value
+        }
+        if changes:
+            result.append(ElementUpdate(element_id=element_id, parameters=changes))
+    return result
+
+
+def updates_to_columns(updates):
+    """Convert batch_update entries into element_ids/param_names/values arrays.
+
+    values[i][j] is the new value of param_names[j] on element_ids[i], or None
+    when that element doesn't update the parameter.
+
+    Args:
+        updates: The "updates" list of a batch_update_payload
+
+    Returns:
+        dict with element_ids, param_names and values, or None when an update
+        explicitly sets a value to None (which the columnar form can't express)
+    """
+    param_names = {}
+    for update in updates:
+        for name, value in update["parameters"].items():
+            if value is None:
+                return None
+            param_names.setdefault(name, len(param_names))
+
+    values = []
+    for update in updates:
+        row = [None] * len(param_names)
+        for name, value in update["parameters"].items():
+            row[param_names[name]] = value
+        values.append(row)
+
+    return {
+        "element_ids": [update["element_id"] for update in updates],
+        "param_names": list(param_names),
+        "values": values,
+    }
+
+
+def lines_to_polylines(lines):
+    """Group wall lines that share endpoints into polylines.
+
+    A line continues a chain when its start equals the chain's current end, so
+    a rectangle drawn as four lines becomes one closed polyline. Lines that
+    don't connect to anything (or have points other than x/y) stay segments, as
+    do chains that return to their start through fewer than 3 distinct points
+    (e.g. A->B, B->A), which Revit can't build as a loop.
+
+    Args:
+        lines: List of {"start": {"x", "y"}, "end": {"x", "y"}} definitions
+
+    Returns:
+        dict: {"polylines": [{"points": [[x, y], ...], "closed": bool}],
+               "segments": [line, ...]}
+
+    Example:
+        lines_to_polylines([
+            {"start": {"x": 0, "y": 0}, "end": {"x": 5, "y": 0}},
+            {"start": {"x": 5, "y": 0}, "end": {"x": 5, "y": 4}},
+        ])
+        # {"polylines": [{"points": [[0, 0], [5, 0], [5, 4]], "closed": False}],
+        #  "segments": []}
+    """
+    def point(p):
+        return (p["x"], p["y"]) if len(p) == 2 and "x" in p and "y" in p else None
+
+    chainable = [i for i, line in enumerate(lines)
+                 if point(line["start"]) is not None and point(line["end"]) is not None]
+    chainable_ids = set(chainable)
+    segments = [line for i, line in enumerate(lines) if i not in chainable_ids]
+    starts = defaultdict(list)
+    for i in chainable:
+        starts[point(lines[i]["start"])].append(i)
+    ends = {point(lines[i]["end"]) for i in chainable}
+
+    # Walk from lines nothing leads into first, so open chains aren't split
+    chainable.sort(key=lambda i: point(lines[i]["start"]) in ends)
+
+    used = set()
+    polylines = []
+    for first in chainable:
+        if first in used:
+            continue
+        used.add(first)
+        chain = [first]
+        end = point(lines[first]["end"])
+        while True:
+            following = next((j for j in starts.get(end, ()) if j not in used), None)
+            if following is None:
+                break
+            used.add(following)
+            chain.append(following)
+            end = point(lines[following]["end"])
+
+        if len(chain) == 1:
+            segments.append(lines[first])
+            continue
+        points = [point(lines[chain[0]]["start"])] + [point(lines[i]["end"]) for i in chain]
+        closed = points[-1] == points[0]
+        if closed:
+            points.pop()
+            if len(set(points)) < 3:
+                segments.extend(lines[i] for i in chain)
+                continue
+        polylines.append({"points": [list(p) for p in points], "closed": closed})
+
+    return {"polylines": polylines, "segments": segments}
+
+
+def with_rotation(rows, flip):
+    """Copy placements with their 180 degree flip decided up front as rotation_rad.
+
+    The extension still needs the normal vector to build the sketch plane, so
+    normals are kept; only the per-row rotation decision moves to the client.
+
+    Args:
+        rows: List of placement dictionaries
+        flip: Callable returning True for rows that must be rotated 180 degrees
+
+    Returns:
+        list: New dictionaries with "rotation_rad" set to pi or 0.0
+    """
+    return [dict(row, rotation_rad=math.pi if flip(row) else 0.0) for row in rows]
+
+
+# Route payloads in their baseline form (mm units, row layout), which every
+# extension accepts. Each builder takes the tool's own argument names and
+# defaults, so a tool and submit_batch send the same request. Invalid input
+# raises ValueError before anything is sent.
+
+def check_parameter_names(names):
+    """Raise ValueError if any parameter name is blank"""
+    bad = [name for name in names if not isinstance(name, str) or not name.strip()]
+    if bad:
+        raise ValueError(f"Invalid parameter names: {bad}")
+
+
+def chunk_ids(element_ids):
+    """Split element_ids into lists of at most MULTI_CHUNK_SIZE"""
+    return [
+        element_ids[start:start + MULTI_CHUNK_SIZE]
+        for start in range(0, len(element_ids), MULTI_CHUNK_SIZE)
+    ]
+
+
+def batch_update_payload(updates, expected_values=None):
+    """/batch_update/ payload; entries are merged and unchanged values dropped"""
+    expected_values = {int(k): v for k, v in (expected_values or {}).items()}
+    merged = merge_updates([ElementUpdate.model_validate(u) for u in updates], expected_values)
+    return {"updates": [update.model_dump(mode="json") for update in merged]}
+
+
+def create_sheet_payload(sheet_number, sheet_name="New Sheet", title_block_name=""):
+    """/create_sheet/ payload"""
+    data = {"sheet_number": sheet_number, "sheet_name": sheet_name}
+    if title_block_name:
+        data["title_block_name"] = title_block_name
+    return data
+
+
+def place_view_payload(sheet_id=0, view_id=0, sheet_number="", view_name="", x=1.0, y=0.75):
+    """/place_view_on_sheet/ payload (position in feet)"""
+    data = {"x": x, "y": y}
+    if sheet_id:
+        data["sheet_id"] = sheet_id
+    if view_id:
+        data["view_id"] = view_id
+    if sheet_number:
+        data["sheet_number"] = sheet_number
+    if view_name:
+        data["view_name"] = view_name
+    return data
+
+
+def walls_payload(line_ids=None, lines=None, wall_type_name="", level_name="",
+                  height=3000, structural=False):
+    """/create_walls_at_lines/ payload (coordinates and height in mm)"""
+    data = {
+        "line_ids": line_ids or [],
+        "lines": lines or [],
+        "height": height,
+        "structural": structural,
+    }
+    if wall_type_name:
+        data["wall_type_name"] = wall_type_name
+    if level_name:
+        data["level_name"] = level_name
+    return data
+
+
+def family_placement_payload(family_name, placements, type_name="", level_name=""):
+    """/batch_family_placement/ payload (coordinates in mm, one row per placement)"""
+    rows = [FamilyPlacement.model_validate(placement).model_dump() for placement in placements]
+    data = {"family_name": family_name, "placements": rows}
+    if type_name:
+        data["type_name"] = type_name
+    if level_name:
+        data["level_name"] = level_name
+    return data
+
+
+def get_parameter_payload(element_id, parameter_name):
+    """/get_parameter/ payload"""
+    return {"element_id": element_id, "parameter_name": parameter_name}
+
+
+def set_parameter_payload(element_id, parameter_name, value):
+    """/set_parameter/ payload"""
+    check_parameter_names([parameter_name])
+    return {"element_id": element_id, "parameter_name": parameter_name, "value": value}
+
+
+def all_parameters_payload(element_id, include_empty=False, include_readonly=True):
+    """/get_all_parameters/ payload"""
+    return {
+        "element_id": element_id,
+        "include_empty": include_empty,
+        "include_readonly": include_readonly,
+    }
+
+
+def bulk_parameters_payload(element_id, parameters):
+    """/set_parameters_bulk/ payload"""
+    if not parameters:
+        raise ValueError("No parameters given")
+    check_parameter_names(parameters)
+    return {"element_id": element_id, "parameters": parameters}
+
+
+def multi_parameters_payloads(element_ids, parameters):
+    """/set_parameters_multi/ payloads, one per chunk of MULTI_CHUNK_SIZE elements"""
+    if not element_ids:
+        raise ValueError("No element_ids given")
+    if not parameters:
+        raise ValueError("No parameters given")
+    check_parameter_names(parameters)
+    return [{"element_ids": ids, "parameters": parameters} for ids in chunk_ids(element_ids)]
+
+
+def quick_count_payload(category, type_contains=None, type_excludes=None, level=None, in_view=False):
+    """/quick_count/ payload"""
+    data = {"category": category, "in_view": in_view}
+    if type_contains:
+        data["type_contains"] = type_contains
+    if type_excludes:
+        data["type_excludes"] = type_excludes
+    if level:
+        data["level"] = level
+    return data
+
+
+def color_splash_payload(category_name, parameter_name, use_gradient=False, custom_colors=None):
+    """/color_splash/ payload"""
+    data = {
+        "category_name": category_name,
+        "parameter_name": parameter_name,
+        "use_gradient": use_gradient,
+    }
+    if custom_colors:
+        data["custom_colors"] = custom_colors
+    return data
+
+
+def clear_colors_payload(category_name):
+    """/clear_colors/ payload"""
+    return {"category_name": category_name}
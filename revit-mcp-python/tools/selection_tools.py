@@ -3,7 +3,21 @@
 
 from fastmcp import Context
 from typing import Optional, List
-from .utils import format_response
+from .payloads import quick_count_payload
+from .utils import (
+    ELEMENT_CACHE_TTL,
+    cached_get,
+    disk_cached_get,
+    format_response,
+    gather_limited,
+    invalidate,
+    log,
+    single_flight,
+    unwrap_response,
+)
+
+# Identical quick_count filters within this window reuse the previous count
+QUICK_COUNT_TTL = 3.0
 
 
 def register_selection_tools(mcp, revit_get, revit_post):
@@ -24,7 +38,7 @@ def register_selection_tools(mcp, revit_get, revit_post):
             JSON with selection details or message if nothing is selected
         """
         if ctx:
-            ctx.info("Getting active selection info...")
+            log(ctx, "Getting active selection info...")
         response = await revit_get("/active_selection/", ctx)
         return format_response(response)
 
@@ -40,8 +54,8 @@ def register_selection_tools(mcp, revit_get, revit_post):
             JSON with detailed element information including all parameters
         """
         if ctx:
-            ctx.info("Inspecting selected element at index {}...".format(index))
-        response = await revit_get("/inspect_selected/{}".format(index), ctx)
+            log(ctx, f"Inspecting selected element at index {index}...")
+        response = await revit_get(f"/inspect_selected/{index}", ctx)
         return format_response(response)
 
     @mcp.tool()
@@ -64,14 +78,54 @@ def register_selection_tools(mcp, revit_get, revit_post):
 
         Returns:
             JSON with comprehensive element information
+
+        To inspect several elements, use inspect_elements instead.
         """
         if ctx:
-            ctx.info("Inspecting element ID {}...".format(element_id))
-        response = await revit_get("/inspect_element/{}".format(element_id), ctx)
+            log(ctx, f"Inspecting element ID {element_id}...")
+        response = await cached_get(
+            ("inspect_element", element_id),
+            ELEMENT_CACHE_TTL,
+            lambda: revit_get(f"/inspect_element/{element_id}", ctx),
+        )
         return format_response(response)
 
     @mcp.tool()
-    async def get_link_status(ctx: Context = None) -> str:
+    async def inspect_elements(element_ids: List[int], ctx: Context = None) -> str:
+        """
+        Get comprehensive information about several elements at once.
+
+        Same data as inspect_element for each ID, but requests run
+        concurrently - prefer this over calling inspect_element in a loop.
+
+        Args:
+            element_ids: List of Revit element IDs to inspect
+
+        Returns:
+            JSON list with the information (or error) for each element, in order
+
+        Example:
+            inspect_elements([12345, 12346, 12347])
+        """
+        if ctx:
+            log(ctx, f"Inspecting {len(element_ids)} elements...")
+
+        responses = await gather_limited([
+            lambda element_id=element_id: cached_get(
+                ("inspect_element", element_id),
+                ELEMENT_CACHE_TTL,
+                lambda: revit_get(f"/inspect_element/{element_id}", ctx),
+            )
+            for element_id in element_ids
+        ])
+        results = [
+            {"element_id": element_id, "element": unwrap_response(response)}
+            for element_id, response in zip(element_ids, responses)
+        ]
+        return format_response({"count": len(results), "results": results})
+
+    @mcp.tool()
+    async def get_link_status(refresh: bool = False, ctx: Context = None) -> str:
         """
         Get comprehensive information about all linked models in the project.
         
@@ -85,12 +139,25 @@ def register_selection_tools(mcp, revit_get, revit_post):
         
         Useful for understanding IFC links and their coordinate systems.
 
+        The result is reused from disk for the same document for up to
+        REVIT_DISK_CACHE_TTL seconds (default 300), or until the model is
+        modified through this server. A reused result still costs one /status/
+        round trip to identify the document.
+
+        Args:
+            refresh: If True, re-read the link status from Revit
+
         Returns:
             JSON with all linked model information
         """
         if ctx:
-            ctx.info("Getting link status...")
-        response = await revit_get("/link_status/", ctx)
+            log(ctx, "Getting link status...")
+        response = await single_flight(
+            ("get_link_status", refresh),
+            lambda: disk_cached_get(
+                "link_status", revit_get, lambda: revit_get("/link_status/", ctx), ctx, refresh
+            ),
+        )
         return format_response(response)
 
     @mcp.tool()
@@ -100,6 +167,7 @@ def register_selection_tools(mcp, revit_get, revit_post):
         type_excludes: Optional[List[str]] = None,
         level: Optional[str] = None,
         in_view: bool = False,
+        no_cache: bool = False,
         ctx: Context = None
     ) -> str:
         """
@@ -114,6 +182,8 @@ def register_selection_tools(mcp, revit_get, revit_post):
             type_excludes: Exclude elements whose type name contains any of these strings
             level: Only count elements on this level
             in_view: If True, only count elements visible in the current view
+            no_cache: If True, always recount instead of reusing an identical
+                      count from the last few seconds
 
         Returns:
             JSON with count, filters applied, and first 100 element IDs
@@ -125,19 +195,13 @@ def register_selection_tools(mcp, revit_get, revit_post):
             - quick_count("Walls", level="00_begane grond") -> walls on ground floor
         """
         if ctx:
-            ctx.info("Quick count for category: {}".format(category))
-        
-        data = {
-            "category": category,
-            "in_view": in_view
-        }
+            log(ctx, f"Quick count for category: {category}")
         
-        if type_contains:
-            data["type_contains"] = type_contains
-        if type_excludes:
-            data["type_excludes"] = type_excludes
-        if level:
-            data["level"] = level
-        
-        response = await revit_post("/quick_count/", data, ctx)
+        data = quick_count_payload(category, type_contains, type_excludes, level, in_view)
+
+        excludes = tuple(sorted(type_excludes or ()))
+        key = ("quick_count", category, type_contains, excludes, level, in_view)
+        if no_cache:
+            invalidate(*key)
+        response = await cached_get(key, QUICK_COUNT_TTL, lambda: revit_post("/quick_count/", data, ctx))
         return format_response(response)
@@ -2,7 +2,7 @@
 """Status and model information tools"""
 
 from fastmcp import Context
-from .utils import format_response
+from .utils import disk_cached_get, format_response, remember_status, single_flight
 
 
 def register_status_tools(mcp, revit_get):
@@ -12,10 +12,22 @@ def register_status_tools(mcp, revit_get):
     async def get_revit_status(ctx: Context = None) -> str:
         """Check if the Revit MCP API is active and responding"""
         response = await revit_get("/status/", ctx, timeout=10.0)
+        remember_status(response)
         return format_response(response)
 
     @mcp.tool()
-    async def get_revit_model_info(ctx: Context = None) -> str:
-        """Get comprehensive information about the current Revit model"""
-        response = await revit_get("/model_info/", ctx)
+    async def get_revit_model_info(refresh: bool = False, ctx: Context = None) -> str:
+        """Get comprehensive information about the current Revit model
+
+        The result is reused from disk for the same document for up to
+        REVIT_DISK_CACHE_TTL seconds (default 300), or until the model is
+        modified through this server; pass refresh=True to re-read it. A reused
+        result still costs one /status/ round trip to identify the document.
+        """
+        response = await single_flight(
+            ("get_revit_model_info", refresh),
+            lambda: disk_cached_get(
+                "model_info", revit_get, lambda: revit_get("/model_info/", ctx), ctx, refresh
+            ),
+        )
         return format_response(response)
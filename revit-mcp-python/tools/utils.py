@@ -1,7 +1,475 @@
 # -*- coding: utf-8 -*-
 """Utility functions for MCP tools"""
 
+import asyncio
+import glob
+import hashlib
 import json
+import os
+import time
+from collections import OrderedDict
+
+import orjson
+
+# How long the capabilities advertised on /status/ are trusted before re-checking
+CAPABILITY_TTL = 60.0
+
+# After a failed /status/ probe, assume no capabilities for this long before probing again
+CAPABILITY_RETRY_TTL = 10.0
+
+# Upper bound on concurrent requests a single tool fans out to Revit
+MAX_CONCURRENCY = int(os.environ.get("REVIT_MAX_CONCURRENCY", "16"))
+
+# Longest silence allowed between progress events of a streamed batch operation
+STREAM_EVENT_TIMEOUT = 30.0
+
+# Parameter reads arriving within this window share one request (at most MAX_BATCH reads)
+BATCH_LINGER_MS = float(os.environ.get("REVIT_BATCH_LINGER_MS", "5"))
+MAX_BATCH = int(os.environ.get("REVIT_MAX_BATCH", "64"))
+
+# Buffered parameter writes are flushed once this many are pending
+MAX_WRITE_BATCH = int(os.environ.get("REVIT_MAX_WRITE_BATCH", "32"))
+
+# How long element inspection and parameter listings are reused before re-fetching
+ELEMENT_CACHE_TTL = float(os.environ.get("REVIT_CACHE_TTL", "15"))
+
+# Slow, rarely changing model descriptions are kept on disk across sessions, in a
+# subdirectory of their own since invalidate() deletes every entry in it
+DISK_CACHE_DIR = os.path.join(
+    os.environ.get("REVIT_MCP_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "revit-mcp"),
+    "responses",
+)
+DISK_CACHE_TTL = float(os.environ.get("REVIT_DISK_CACHE_TTL", "300"))
+
+_capabilities = {"names": frozenset(), "document": None, "expires": 0.0}
+_log_tasks = set()
+_in_flight = {}  # key -> task of the request currently fetching it
+
+
+class TTLCache(object):
+    """Small LRU cache for Revit responses whose entries expire after a TTL.
+
+    Keys are tuples starting with the tool or endpoint name, so related entries
+    can be dropped together with invalidate(prefix).
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key):
+        """Return the cached value for key, or None when missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value, ttl):
+        """Store value under key for ttl seconds, evicting the oldest entries if full"""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *prefix):
+        """Drop entries whose key starts with prefix (all entries if no prefix)"""
+        if not prefix:
+            self._entries.clear()
+            return
+        size = len(prefix)
+        for key in [k for k in self._entries if k[:size] == prefix]:
+            del self._entries[key]
+
+
+response_cache = TTLCache(maxsize=512)
+
+
+def log(ctx, message, level="info"):
+    """Send a log message to the MCP client without waiting for it to be written.
+
+    Context.info/error are coroutines in fastmcp 2.x: calling them without
+    await silently drops the message, and awaiting them would delay the Revit
+    request behind the notification. They are scheduled as tasks instead.
+
+    Args:
+        ctx: The tool's Context (may be None)
+        message: Text to send
+        level: Context method to use ("info", "warning", "error", "debug")
+    """
+    if ctx is None:
+        return
+    result = getattr(ctx, level)(message)
+    if asyncio.iscoroutine(result):
+        task = asyncio.ensure_future(result)
+        _log_tasks.add(task)
+        task.add_done_callback(_log_done)
+
+
+def _log_done(task):
+    _log_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()  # a closed session only loses the message
+
+
+def unwrap_response(response):
+    """Return the payload of a pyRevit routes response, unwrapping a "data" envelope"""
+    if type(response) is dict:
+        data = response.get("data")
+        if type(data) is dict and len(response) <= 2:
+            return data
+    return response
+
+
+def is_error(response):
+    """True when a revit_get/revit_post result is an error string or error payload"""
+    response = unwrap_response(response)
+    return not isinstance(response, dict) or "error" in response
+
+
+async def gather_limited(factories, limit=MAX_CONCURRENCY):
+    """Run independent requests concurrently, at most `limit` at a time.
+
+    Args:
+        factories: Callables returning the coroutine to await, e.g.
+                   lambda: revit_post("/endpoint/", data, ctx)
+        limit: Maximum number of requests in flight
+
+    Returns:
+        list: Results in the same order as `factories`
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(factory):
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(run(factory) for factory in factories))
+
+
+def combine_chunk_responses(responses, sizes):
+    """Combine the replies of one request that was split into chunks.
+
+    The replies are not merged field by field, since the route doesn't define
+    which fields add up. Each is returned as-is next to a summary computed here:
+
+        {"status": "success" | "partial",
+         "summary": {"chunk_count": n, "element_count": total, "failed_chunks": [index, ...]},
+         "chunks": [{"chunk": index, "element_count": size, "result": {...}}, ...]}
+
+    If every chunk failed, the first failure is returned instead.
+
+    Args:
+        responses: revit_post results, one per chunk
+        sizes: Number of elements sent in each chunk
+    """
+    failed = [index for index, response in enumerate(responses) if is_error(response)]
+    if responses and len(failed) == len(responses):
+        return responses[0]
+
+    return {
+        "status": "partial" if failed else "success",
+        "summary": {
+            "chunk_count": len(responses),
+            "element_count": sum(sizes),
+            "failed_chunks": failed,
+        },
+        "chunks": [
+            {"chunk": index, "element_count": size, "result": unwrap_response(response)}
+            for index, (response, size) in enumerate(zip(responses, sizes))
+        ],
+    }
+
+
+class ParameterReadBatcher(object):
+    """Coalesces concurrent single-parameter reads into /get_parameters_batch/ requests.
+
+    Reads arriving within BATCH_LINGER_MS of the first pending one (or until
+    MAX_BATCH are pending) are sent together; each caller receives the result
+    at its own index. If the batch request fails, every caller gets the error.
+    """
+
+    def __init__(self, revit_post, linger_ms=BATCH_LINGER_MS, max_batch=MAX_BATCH):
+        self._revit_post = revit_post
+        self._linger = linger_ms / 1000.0
+        self._max_batch = max_batch
+        self._pending = []  # (request, future, ctx)
+        self._timer = None
+        self._tasks = set()
+
+    async def get(self, element_id, parameter_name, ctx=None):
+        """Queue one read and wait for its result from the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        request = {"element_id": element_id, "parameter_name": parameter_name}
+        self._pending.append((request, future, ctx))
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        data = {"requests": [request for request, _, _ in batch]}
+        response = await self._revit_post("/get_parameters_batch/", data, batch[0][2])
+
+        results = None
+        if not is_error(response):
+            results = unwrap_response(response).get("results")
+        for index, (_, future, _) in enumerate(batch):
+            if future.done():  # caller was cancelled
+                continue
+            if results is not None and index < len(results):
+                future.set_result(results[index])
+            else:
+                future.set_result(response)
+
+
+class ParameterWriteCoalescer(object):
+    """Buffers single-parameter writes and flushes them as bulk writes.
+
+    Writes arriving within BATCH_LINGER_MS of the first pending one (or until
+    MAX_WRITE_BATCH are pending) are grouped per element. Elements receiving
+    the same parameter values share one /set_parameters_multi/ request, a
+    single element with several values uses /set_parameters_bulk/, and a lone
+    write still goes to /set_parameter/. Each caller receives the response of
+    the request that carried its write.
+    """
+
+    def __init__(self, revit_post, linger_ms=BATCH_LINGER_MS, max_batch=MAX_WRITE_BATCH):
+        self._revit_post = revit_post
+        self._linger = linger_ms / 1000.0
+        self._max_batch = max_batch
+        self._pending = OrderedDict()  # element_id -> {parameter_name: value}
+        self._waiters = []  # (element_id, future)
+        self._ctx = None
+        self._timer = None
+        self._tasks = set()
+
+    async def set(self, element_id, parameter_name, value, ctx=None):
+        """Queue one write and wait for the request that carries it"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(element_id, {})[parameter_name] = value
+        self._waiters.append((element_id, future))
+        if self._ctx is None:
+            self._ctx = ctx
+
+        if len(self._waiters) >= self._max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._linger, self._schedule_flush)
+        return await future
+
+    async def flush(self):
+        """Send all pending writes now, returning the responses of the requests made"""
+        return await self._send(*self._take())
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = (self._pending, self._waiters, self._ctx)
+        self._pending, self._waiters, self._ctx = OrderedDict(), [], None
+        return batch
+
+    def _schedule_flush(self):
+        task = asyncio.ensure_future(self._send(*self._take()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending, waiters, ctx):
+        # Elements receiving identical values are written together
+        groups = OrderedDict()
+        for element_id, parameters in pending.items():
+            key = orjson.dumps(parameters, default=str, option=orjson.OPT_SORT_KEYS)
+            groups.setdefault(key, []).append(element_id)
+
+        responses = []
+        by_element = {}
+        for element_ids in groups.values():
+            parameters = pending[element_ids[0]]
+            if len(element_ids) > 1:
+                data = {"element_ids": element_ids, "parameters": parameters}
+                response = await self._revit_post("/set_parameters_multi/", data, ctx)
+            elif len(parameters) > 1:
+                data = {"element_id": element_ids[0], "parameters": parameters}
+                response = await self._revit_post("/set_parameters_bulk/", data, ctx)
+            else:
+                parameter_name, value = next(iter(parameters.items()))
+                data = {
+                    "element_id": element_ids[0],
+                    "parameter_name": parameter_name,
+                    "value": value,
+                }
+                response = await self._revit_post("/set_parameter/", data, ctx)
+            responses.append(response)
+            for element_id in element_ids:
+                by_element[element_id] = response
+
+        if pending:
+            invalidate()
+        for element_id, future in waiters:
+            if not future.done():  # caller was cancelled
+                future.set_result(by_element[element_id])
+        return responses
+
+
+async def single_flight(key, coro_factory):
+    """Share one request between concurrent callers asking for the same key.
+
+    The first caller starts coro_factory(); callers arriving while it is in
+    flight await the same result instead of sending a duplicate request.
+    Cancelling one caller does not cancel the request for the others. Only
+    use this for reads.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _in_flight[key] = task
+
+        def forget(done):
+            if _in_flight.get(key) is done:
+                del _in_flight[key]
+
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+async def cached_get(cache_key, ttl_s, coro_factory):
+    """Return a cached response for cache_key, calling coro_factory on a miss.
+
+    Only successful responses are cached, so errors are retried on the next call.
+    Concurrent misses for the same key share one request (see single_flight).
+
+    Example:
+        response = await cached_get(
+            ("list_levels",), 30, lambda: revit_get("/list_levels/", ctx)
+        )
+    """
+    response = response_cache.get(cache_key)
+    if response is None:
+        response = await single_flight(cache_key, coro_factory)
+        if not is_error(response):
+            response_cache.put(cache_key, response, ttl_s)
+    return response
+
+
+def invalidate(*prefix):
+    """Drop cached responses after a tool modified the model.
+
+    Called without arguments it clears the whole cache; pass a key prefix such
+    as ("list_families",) to drop only related entries.
+    """
+    response_cache.invalidate(*prefix)
+    if not prefix:
+        for path in glob.glob(os.path.join(DISK_CACHE_DIR, "*-*.json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+async def disk_cached_get(name, revit_get, coro_factory, ctx=None, refresh=False):
+    """Return a response stored on disk for the open document, fetching it on a miss.
+
+    Entries are keyed by name and the open document as reported by a fresh
+    /status/ call (title, plus path when the extension reports one), so a
+    document switch is never answered from the previous document's entry.
+    They expire after DISK_CACHE_TTL, since edits made in the Revit UI are not
+    seen here; any write through this server (invalidate()) removes them. With
+    refresh=True the stored entry is ignored and replaced.
+    """
+    if not await _refresh_status(revit_get, ctx, force=True) or not _capabilities["document"]:
+        return await coro_factory()
+
+    document = hashlib.blake2b(_capabilities["document"].encode("utf-8"), digest_size=8).hexdigest()
+    path = os.path.join(DISK_CACHE_DIR, "{}-{}.json".format(name, document))
+    if not refresh:
+        try:
+            if time.time() - os.path.getmtime(path) < DISK_CACHE_TTL:
+                with open(path, "rb") as f:
+                    return orjson.loads(f.read())
+        except (OSError, ValueError):
+            pass  # missing or unreadable entry: fetch it again
+
+    response = await coro_factory()
+    if not is_error(response):
+        try:
+            os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(orjson.dumps(response, default=str))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass  # caching is best effort
+    return response
+
+
+async def batch_post_options(revit_get, ctx=None, timeout=None):
+    """revit_post keyword arguments for long-running batch placement routes.
+
+    Extensions advertising "ndjson_progress" stream one event per placement, so
+    the request is streamed with a per-event timeout and progress is reported to
+    the MCP client. Otherwise the caller's blocking timeout is kept.
+    """
+    if await server_supports(revit_get, "ndjson_progress", ctx):
+        return {"stream": True, "timeout": STREAM_EVENT_TIMEOUT}
+    return {"timeout": timeout} if timeout else {}
+
+
+async def server_supports(revit_get, capability, ctx=None):
+    """Check whether the pyRevit extension advertises an optional capability.
+
+    Newer extensions list composite routes and payload formats under
+    "capabilities" in their /status/ response. Older extensions don't, so tools
+    keep using the original routes unless the capability is advertised.
+    """
+    if not await _refresh_status(revit_get, ctx):
+        return False
+    return capability in _capabilities["names"]
+
+
+async def _refresh_status(revit_get, ctx=None, force=False):
+    """Re-read /status/ once CAPABILITY_TTL has passed (or now, with force); False if unreachable"""
+    if force or time.monotonic() >= _capabilities["expires"]:
+        response = await single_flight(
+            ("/status/",), lambda: revit_get("/status/", ctx, timeout=10.0)
+        )
+        if is_error(response):
+            # Remember the failure, so the checks of one tool call (and the calls
+            # right after it) don't each wait on another probe
+            _capabilities["names"] = frozenset()
+            _capabilities["document"] = None
+            _capabilities["expires"] = time.monotonic() + CAPABILITY_RETRY_TTL
+            return False
+        remember_status(response)
+    return True
+
+
+def remember_status(response):
+    """Record capabilities and open document from a /status/ response"""
+    response = unwrap_response(response)
+    if not isinstance(response, dict) or "error" in response:
+        return
+    _capabilities["names"] = frozenset(response.get("capabilities") or ())
+    title = response.get("document_title")
+    path = response.get("document_path")
+    _capabilities["document"] = "{}\n{}".format(title, path) if title and path else title
+    _capabilities["expires"] = time.monotonic() + CAPABILITY_TTL
 
 
 def format_response(response):
@@ -14,47 +482,47 @@ def format_response(response):
         str: Formatted string response suitable for MCP tool return values
     """
     # Handle string responses (usually errors from httpx)
-    if not isinstance(response, dict):
+    if type(response) is not dict:
         return str(response)
 
     # Check if response is wrapped in a "data" key (pyRevit routes behavior)
-    # If so, unwrap it for processing
-    if "data" in response and isinstance(response["data"], dict) and len(response) <= 2:
-        response = response["data"]
+    # If so, unwrap it for processing (same rule as unwrap_response, minus the type check)
+    data = response.get("data")
+    if type(data) is dict and len(response) <= 2:
+        response = data
 
     # Check for explicit error
     if "error" in response:
         error_msg = response.get("error", "Unknown error occurred")
         traceback_info = response.get("traceback", "")
 
-        error_parts = ["=== ERROR ==="]
-        error_parts.append("Error: {}".format(error_msg))
-
         if traceback_info:
-            error_parts.append("\n=== TRACEBACK ===")
-            error_parts.append(traceback_info)
-
-        return "\n".join(error_parts)
-
-    # Get status for special handling
-    status = response.get("status", "").lower()
-    health = response.get("health", "").lower()
+            return f"=== ERROR ===\nError: {error_msg}\n\n=== TRACEBACK ===\n{traceback_info}"
+        return f"=== ERROR ===\nError: {error_msg}"
 
     # Code execution with output - return raw output
     if "output" in response:
         return response["output"]
 
     # Status check response - special human-readable formatting
-    if status == "active" and health == "healthy":
-        status_parts = ["=== REVIT STATUS ==="]
-        status_parts.append("Status: {}".format(response.get("status", "Unknown")))
-        status_parts.append("Health: {}".format(response.get("health", "Unknown")))
-        if "api_name" in response:
-            status_parts.append("API: {}".format(response["api_name"]))
-        if "document_title" in response:
-            status_parts.append("Document: {}".format(response["document_title"]))
-        return "\n".join(status_parts)
+    # (only lowercase when both fields are present, which is rare outside /status/)
+    status = response.get("status")
+    health = response.get("health")
+    if status and health and status.lower() == "active" and health.lower() == "healthy":
+        api = f"\nAPI: {response['api_name']}" if "api_name" in response else ""
+        document = f"\nDocument: {response['document_title']}" if "document_title" in response else ""
+        return f"=== REVIT STATUS ===\nStatus: {status}\nHealth: {health}{api}{document}"
 
     # All other responses (including data-rich responses) - return as formatted JSON
-    # This ensures selection tools, quick_count, inspect_element, etc. return their full data
-    return json.dumps(response, indent=2, ensure_ascii=False, default=str)
+    # This ensures selection tools, quick_count, inspect_element, etc. return their full data.
+    # orjson only calls `default` for values it cannot encode natively, so plain int lists
+    # such as quick_count's element_ids already take its native path - no per-shape branch needed
+    try:
+        return orjson.dumps(
+            response,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode("utf-8")
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which the stdlib encoder still handles
+        return json.dumps(response, indent=2, ensure_ascii=False, default=str)
@@ -2,7 +2,7 @@
 """View-related tools for capturing and listing Revit views"""
 
 from fastmcp import Context
-from .utils import format_response
+from .utils import format_response, log
 
 
 def register_view_tools(mcp, revit_get, revit_post, revit_image):
@@ -35,7 +35,7 @@ def register_view_tools(mcp, revit_get, revit_post, revit_image):
         - Template status
         """
         if ctx:
-            ctx.info("Getting current view information...")
+            log(ctx, "Getting current view information...")
         response = await revit_get("/current_view_info/", ctx)
         return format_response(response)
 
@@ -55,6 +55,6 @@ def register_view_tools(mcp, revit_get, revit_post, revit_image):
         and analyzing the content of the active view.
         """
         if ctx:
-            ctx.info("Getting elements in current view...")
+            log(ctx, "Getting elements in current view...")
         response = await revit_get("/current_view_elements/", ctx)
         return format_response(response)